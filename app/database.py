@@ -1,6 +1,9 @@
 from __future__ import annotations
 import os
-from sqlalchemy import create_engine
+import threading
+from contextvars import ContextVar
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.pool import StaticPool
 from sqlalchemy.orm import sessionmaker, DeclarativeBase, scoped_session
 from dotenv import load_dotenv
 
@@ -8,19 +11,110 @@ load_dotenv()
 
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./jobhunt.db")
 
-connect_args = {}
+engine_kwargs = {}
 if DATABASE_URL.startswith("sqlite"):
-    connect_args = {"check_same_thread": False}
+    engine_kwargs["connect_args"] = {"check_same_thread": False}
+    if ":memory:" in DATABASE_URL:
+        # share one connection so every session sees the same in-memory DB
+        engine_kwargs["poolclass"] = StaticPool
+else:
+    # Postgres etc.: size the pool for concurrent requests, drop stale connections
+    engine_kwargs.update(
+        pool_size=20,
+        max_overflow=40,
+        pool_recycle=3600,
+        pool_pre_ping=True,
+        pool_timeout=30,
+    )
 
-engine = create_engine(DATABASE_URL, echo=False, future=True, connect_args=connect_args)
-SessionLocal = scoped_session(sessionmaker(bind=engine, autoflush=False, autocommit=False))
+engine = create_engine(DATABASE_URL, echo=False, future=True, **engine_kwargs)
+
+# SQLite tuning: WAL lets readers run alongside the writer and NORMAL sync
+# halves fsyncs per commit. Not applicable to in-memory databases.
+SQLITE_PRAGMAS = (
+    "PRAGMA journal_mode=WAL;",
+    "PRAGMA synchronous=NORMAL;",
+    "PRAGMA temp_store=MEMORY;",
+    "PRAGMA mmap_size=268435456;",
+    "PRAGMA cache_size=-64000;",
+    "PRAGMA busy_timeout=5000;",
+)
+
+if DATABASE_URL.startswith("sqlite") and ":memory:" not in DATABASE_URL:
+    @event.listens_for(engine, "connect")
+    def _set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for pragma in SQLITE_PRAGMAS:
+                cursor.execute(pragma)
+        finally:
+            cursor.close()
+
+# Sessions are scoped per request rather than per thread: FastAPI reuses
+# threadpool workers across requests. The middleware in main.py sets a fresh
+# token per request; code outside a request falls back to the thread.
+request_scope: ContextVar[object | None] = ContextVar("request_scope", default=None)
+
+def _session_scope():
+    scope = request_scope.get()
+    return scope if scope is not None else threading.get_ident()
+
+SessionLocal = scoped_session(
+    sessionmaker(bind=engine, autoflush=False, autocommit=False),
+    scopefunc=_session_scope,
+)
 
 class Base(DeclarativeBase):
     pass
 
+# Full-text index over company/role backing the list/export `search=` filter.
+# External-content FTS5 table kept in sync with `applications` by triggers.
+# The trigram tokenizer (SQLite >= 3.34) gives case-insensitive substring
+# matches, the same semantics as the LIKE/ILIKE search on other databases.
+SQLITE_FTS_DDL = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS applications_fts USING fts5("
+    "company, role, content='applications', content_rowid='id', tokenize='trigram')",
+    "CREATE TRIGGER IF NOT EXISTS applications_fts_ai AFTER INSERT ON applications BEGIN "
+    "INSERT INTO applications_fts(rowid, company, role) VALUES (new.id, new.company, new.role); END",
+    "CREATE TRIGGER IF NOT EXISTS applications_fts_ad AFTER DELETE ON applications BEGIN "
+    "INSERT INTO applications_fts(applications_fts, rowid, company, role) "
+    "VALUES ('delete', old.id, old.company, old.role); END",
+    "CREATE TRIGGER IF NOT EXISTS applications_fts_au AFTER UPDATE OF company, role ON applications BEGIN "
+    "INSERT INTO applications_fts(applications_fts, rowid, company, role) "
+    "VALUES ('delete', old.id, old.company, old.role); "
+    "INSERT INTO applications_fts(rowid, company, role) VALUES (new.id, new.company, new.role); END",
+)
+
+@event.listens_for(Base.metadata, "before_create")
+def _create_extensions(target, connection, **kw):
+    if connection.dialect.name == "postgresql":
+        # trigram GIN indexes on company/role need pg_trgm
+        connection.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+
+@event.listens_for(Base.metadata, "before_drop")
+def _drop_search_index(target, connection, **kw):
+    # Not part of the metadata, so drop_all would leave it pointing at rowids
+    # the recreated table reuses; create_all then rebuilds it from scratch.
+    if connection.dialect.name == "sqlite":
+        connection.execute(text("DROP TABLE IF EXISTS applications_fts"))
+
+@event.listens_for(Base.metadata, "after_create")
+def _create_search_index(target, connection, **kw):
+    if connection.dialect.name != "sqlite":
+        return
+    exists = connection.execute(
+        text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'applications_fts'")
+    ).first()
+    for ddl in SQLITE_FTS_DDL:
+        connection.execute(text(ddl))
+    if not exists:
+        # index rows that predate the FTS table
+        connection.execute(text("INSERT INTO applications_fts(applications_fts) VALUES ('rebuild')"))
+
 def get_db():
     db = SessionLocal()
     try:
         yield db
     finally:
-        db.close()
+        # close the session and drop it from the registry (close() alone keeps it)
+        SessionLocal.remove()
@@ -4,18 +4,38 @@ from fastapi import FastAPI
 from sqlalchemy.exc import OperationalError
 
 from .routers import applications, dev
-from .database import Base, engine   # ✅ from app/database.py
+from .database import Base, engine, request_scope   # ✅ from app/database.py
+
+class DBSessionScopeMiddleware:
+    # Fresh scoped_session key per request (see database.SessionLocal). Plain
+    # ASGI, so no extra task or response wrapping as with BaseHTTPMiddleware.
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        token = request_scope.set(object())
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            request_scope.reset(token)
 
 app = FastAPI(title="Job Hunt OS")
+app.add_middleware(DBSessionScopeMiddleware)
 
-@app.get("/health")
+# No ORJSONResponse: routes with a response_model are serialized straight to
+# JSON bytes by Pydantic, which a custom default_response_class would bypass.
+@app.get("/health", response_model=dict)
 def health():
     return {"status": "ok"}
 
 # main app routes
 app.include_router(applications.router)
 
-# create tables on startup (with small retry for Dockerized PG)
+# create tables on startup (with small retry for Dockerized PG).
+# Simple MVP; in real life, use Alembic migrations.
 @app.on_event("startup")
 def on_startup():
     for _ in range(10):
@@ -1,7 +1,7 @@
 from __future__ import annotations
 from datetime import datetime, timezone, date
 from typing import Optional
-from sqlalchemy import String, Integer, Text, DateTime, Date, Index
+from sqlalchemy import String, Integer, Text, DateTime, Date, Index, text, event
 from sqlalchemy.orm import Mapped, mapped_column
 from .database import Base
 
@@ -11,7 +11,7 @@ def utcnow():
 class Application(Base):
     __tablename__ = "applications"
 
-    id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
     company: Mapped[str] = mapped_column(String(200), nullable=False)
     role: Mapped[str] = mapped_column(String(200), nullable=False)
     location: Mapped[Optional[str]] = mapped_column(String(200), nullable=True)
@@ -32,5 +32,34 @@ class Application(Base):
         Index("idx_applications_company_role", "company", "role"),
         Index("idx_applications_stage", "stage"),
         Index("idx_applications_status", "status"),
-        Index("idx_applications_next_action_date", "next_action_date"),
+        # (sort column, id) pairs match _apply_ordering so lists stream in index order
+        Index("idx_applications_created_at_id", "created_at", "id"),
+        Index("idx_applications_updated_at_id", "updated_at", "id"),
+        Index("idx_applications_next_action_id", "next_action_date", "id"),
+        Index(
+            "idx_applications_active", "status",
+            postgresql_where=text("status = 'active'"),
+            sqlite_where=text("status = 'active'"),
+        ),
+        # Postgres search: trigram GIN indexes make ILIKE '%term%' indexable
+        Index(
+            "idx_app_company_trgm", "company",
+            postgresql_using="gin", postgresql_ops={"company": "gin_trgm_ops"},
+        ).ddl_if(dialect="postgresql"),
+        Index(
+            "idx_app_role_trgm", "role",
+            postgresql_using="gin", postgresql_ops={"role": "gin_trgm_ops"},
+        ).ddl_if(dialect="postgresql"),
     )
+
+class CollectionVersion(Base):
+    # One row per collection, bumped in the same transaction as every write to
+    # it. Reading it is a primary-key lookup; it backs the list/export ETag.
+    __tablename__ = "collection_versions"
+
+    name: Mapped[str] = mapped_column(String(50), primary_key=True)
+    version: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+@event.listens_for(CollectionVersion.__table__, "after_create")
+def _seed_collection_versions(target, connection, **kw):
+    connection.execute(target.insert().values(name=Application.__tablename__, version=0))
@@ -1,19 +1,25 @@
 from __future__ import annotations
+import base64
+import hashlib
+import operator
+from datetime import date, datetime
+from functools import lru_cache
 from typing import List, Optional, Iterable, Dict
-from fastapi import APIRouter, Depends, HTTPException, Response
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
 from sqlalchemy.orm import Session
-from sqlalchemy import select, func, or_, asc, desc
-from ..database import get_db, engine, Base
+from sqlalchemy import select, func, or_, asc, desc, tuple_, text, table, column
+from ..database import get_db, engine
 from ..models import Application
-from ..schemas import ApplicationCreate, ApplicationUpdate, ApplicationOut, ListQueryParams, EMPLOYMENT_TYPES, STAGES, STATUSES
+from ..schemas import (
+    ApplicationCreate, ApplicationUpdate, ApplicationOut, ListQueryParams,
+    EMPLOYMENT_TYPES, STAGES, STATUSES, ORDER_BY_FIELDS, ORDER_DIRS,
+)
 from ..deps import require_api_key
+from ..services.applications import collection_version, bump_collection_version
 from ..utils.csv_export import iter_csv
 
 router = APIRouter()
 
-# Create tables if missing (simple MVP). In real life, use Alembic migrations.
-Base.metadata.create_all(bind=engine)
-
 def _validate_business_rules(payload: ApplicationCreate | ApplicationUpdate):
     # Custom 400s instead of 422 for certain rules
     if payload.salary_min is not None and payload.salary_max is not None:
@@ -26,21 +32,146 @@ def _validate_business_rules(payload: ApplicationCreate | ApplicationUpdate):
     if payload.status is not None and payload.status not in STATUSES:
         raise HTTPException(status_code=400, detail="Invalid status")
 
+# CSV column order: model declaration order, same keys as _row_to_dict
+EXPORT_FIELDS = [c.name for c in Application.__table__.columns]
+
+def _row_to_dict(r: Application) -> Dict[str, object]:
+    # Plain mapping for the list/export hot paths; rows come straight from the
+    # DB so re-validating them through ApplicationOut buys nothing.
+    return {
+        "id": r.id,
+        "company": r.company,
+        "role": r.role,
+        "location": r.location,
+        "source": r.source,
+        "link": r.link,
+        "salary_min": r.salary_min,
+        "salary_max": r.salary_max,
+        "employment_type": r.employment_type,
+        "stage": r.stage,
+        "status": r.status,
+        "next_action_date": r.next_action_date,
+        "notes": r.notes,
+        "created_at": r.created_at,
+        "updated_at": r.updated_at,
+    }
+
+def _row_to_csv(r: Application) -> Dict[str, object]:
+    # str(datetime) uses a space separator; keep ISO 8601 in exports
+    row = _row_to_dict(r)
+    row["next_action_date"] = r.next_action_date.isoformat() if r.next_action_date else None
+    row["created_at"] = r.created_at.isoformat()
+    row["updated_at"] = r.updated_at.isoformat()
+    return row
+
+# FTS5 index maintained by the triggers in database.py (SQLite only)
+applications_fts = table("applications_fts", column("rowid"))
+
+# The trigram index cannot match substrings shorter than one trigram
+FTS_MIN_LENGTH = 3
+
+def _fts_query(search: str) -> Optional[str]:
+    # The whole term as one quoted phrase: a substring match, and user input
+    # can't inject FTS syntax
+    if len(search) < FTS_MIN_LENGTH:
+        return None
+    return '"' + search.replace('"', '""') + '"'
+
+def _search_clause(search: str):
+    dialect = engine.dialect.name
+    if dialect == "sqlite":
+        q = _fts_query(search)
+        if q is not None:
+            matches = select(applications_fts.c.rowid).where(text("applications_fts MATCH :q").bindparams(q=q))
+            return Application.id.in_(matches)
+    s = f"%{search}%"
+    if dialect == "sqlite":
+        # SQLite's LIKE is already case-insensitive for ASCII; no lower() per row
+        return or_(Application.company.like(s), Application.role.like(s))
+    # ILIKE: native on Postgres (served by the pg_trgm GIN indexes), emulated elsewhere
+    return or_(Application.company.ilike(s), Application.role.ilike(s))
+
+@lru_cache(maxsize=256)
+def _validate_list_enums(stage: Optional[str], status: Optional[str], order_by: str, order_dir: str) -> None:
+    # Invalid enum/order values become 400s. Only successes are cached, and the
+    # key excludes free-text search, so common combinations hit the cache.
+    if stage is not None and stage not in STAGES:
+        raise HTTPException(status_code=400, detail="Invalid stage")
+    if status is not None and status not in STATUSES:
+        raise HTTPException(status_code=400, detail="Invalid status")
+    if order_by not in ORDER_BY_FIELDS:
+        raise HTTPException(status_code=400, detail="Invalid order_by")
+    if order_dir not in ORDER_DIRS:
+        raise HTTPException(status_code=400, detail="Invalid order_dir")
+
 def _apply_filters(stmt, params: ListQueryParams):
     if params.search:
-        s = f"%{params.search.lower()}%"
-        stmt = stmt.where(or_(func.lower(Application.company).like(s), func.lower(Application.role).like(s)))
+        stmt = stmt.where(_search_clause(params.search))
     if params.stage:
         stmt = stmt.where(Application.stage == params.stage)
     if params.status:
         stmt = stmt.where(Application.status == params.status)
     return stmt
 
+def _encode_cursor(obj: Application, order_by: str) -> str:
+    value = getattr(obj, order_by)
+    raw = f"{value.isoformat() if value is not None else ''}|{obj.id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+def _decode_cursor(cursor: str, order_by: str):
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode()).decode()
+        value, _, cur_id = raw.rpartition("|")
+        parse = date.fromisoformat if order_by == "next_action_date" else datetime.fromisoformat
+        value, cur_id = (parse(value) if value else None), int(cur_id)
+        if not -2**63 <= cur_id < 2**63:
+            # the DB driver would raise OverflowError on bind
+            raise ValueError("cursor id out of range")
+        return value, cur_id
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
 def _apply_ordering(stmt, params: ListQueryParams):
-    # Secondary sort by id for stability
+    # Secondary sort by id for stability. Both keys share one direction so that
+    # (col, id) is a single keyset the cursor can seek past.
     col = getattr(Application, params.order_by)
-    ordering = asc(col) if params.order_dir == "asc" else desc(col)
-    return stmt.order_by(ordering, desc(Application.id))
+    direction = asc if params.order_dir == "asc" else desc
+    nullable = params.order_by == "next_action_date"
+
+    if params.cursor:
+        value, cur_id = _decode_cursor(params.cursor, params.order_by)
+        after = operator.gt if params.order_dir == "asc" else operator.lt
+        if value is None:
+            # NULLs sort last, so only the remaining NULL rows can follow
+            stmt = stmt.where(col.is_(None), after(Application.id, cur_id))
+        elif nullable:
+            stmt = stmt.where(or_(after(tuple_(col, Application.id), tuple_(value, cur_id)), col.is_(None)))
+        else:
+            stmt = stmt.where(after(tuple_(col, Application.id), tuple_(value, cur_id)))
+
+    ordering = direction(col).nulls_last() if nullable else direction(col)
+    return stmt.order_by(ordering, direction(Application.id))
+
+CACHE_CONTROL = "private, max-age=0, must-revalidate"
+
+def _make_etag(*parts: object) -> str:
+    digest = hashlib.md5("|".join(str(p) for p in parts).encode()).hexdigest()
+    return f'W/"{digest}"'
+
+def _collection_etag(db: Session, request: Request) -> str:
+    # Version row is bumped by every write; the query string keys it per representation
+    return _make_etag(collection_version(db), request.url.query)
+
+def _etag_matches(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    # Weak comparison, as If-None-Match requires
+    tags = {t.strip().removeprefix("W/") for t in header.split(",")}
+    return "*" in tags or etag.removeprefix("W/") in tags
+
+def _not_modified(etag: str) -> Response:
+    return Response(status_code=304, headers={"ETag": etag, "Cache-Control": CACHE_CONTROL})
 
 @router.get("/applications", response_model=dict)
 def list_applications(
@@ -51,8 +182,20 @@ def list_applications(
     page_size: int = 20,
     order_by: str = "created_at",
     order_dir: str = "desc",
+    cursor: Optional[str] = None,
+    with_total: bool = False,
+    *,
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db),
 ):
+    _validate_list_enums(stage, status, order_by, order_dir)
+    etag = _collection_etag(db, request)
+    if _etag_matches(request, etag):
+        return _not_modified(etag)
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = CACHE_CONTROL
+
     params = ListQueryParams(
         search=search,
         stage=stage,
@@ -61,39 +204,76 @@ def list_applications(
         page_size=page_size,
         order_by=order_by,
         order_dir=order_dir,
+        cursor=cursor,
+        with_total=with_total,
     )
-    # Convert invalid enum/order values into 400s
-    try:
-        params.validate_enums()
-    except ValueError as e:
-        raise HTTPException(status_code=400, detail=str(e))
 
-    base_stmt = select(Application)
+    # Without a cursor the window count sees the whole filtered set, so the
+    # total rides along with the page in one round trip.
+    fuse_total = params.with_total and not params.cursor
+    columns = [Application, func.count().over().label("_total")] if fuse_total else [Application]
+
+    base_stmt = select(*columns)
     base_stmt = _apply_filters(base_stmt, params)
-    count_stmt = select(func.count()).select_from(_apply_filters(select(Application), params).subquery())
+    base_stmt = _apply_ordering(base_stmt, params)
+    if not params.cursor:
+        # legacy page-number paging; cursor paging seeks instead of skipping rows
+        base_stmt = base_stmt.offset((params.page - 1) * params.page_size)
+    base_stmt = base_stmt.limit(params.page_size)
 
-    total = db.execute(count_stmt).scalar_one()
+    total = None
+    if fuse_total:
+        rows = db.execute(base_stmt).all()
+        items = [r[0] for r in rows]
+        if rows:
+            total = rows[0]._total
+    else:
+        items = db.scalars(base_stmt).all()
 
-    base_stmt = _apply_ordering(base_stmt, params)
-    base_stmt = base_stmt.offset((params.page - 1) * params.page_size).limit(params.page_size)
+    # Separate COUNT only for cursor pages, or an empty page past the end
+    if params.with_total and total is None:
+        count_stmt = select(func.count()).select_from(_apply_filters(select(Application), params).subquery())
+        total = db.execute(count_stmt).scalar_one()
 
-    items = db.execute(base_stmt).scalars().all()
-    out_items = [ApplicationOut.model_validate(i) for i in items]
+    next_cursor = None
+    if len(items) == params.page_size:
+        next_cursor = _encode_cursor(items[-1], params.order_by)
 
     return {
-        "items": [i.model_dump() for i in out_items],
+        "items": [_row_to_dict(i) for i in items],
         "total": total,
         "page": params.page,
         "page_size": params.page_size,
+        "next_cursor": next_cursor,
     }
 
 @router.get("/applications/{app_id}", response_model=ApplicationOut)
-def get_application(app_id: int, db: Session = Depends(get_db)):
+def get_application(app_id: int, request: Request, response: Response, db: Session = Depends(get_db)):
     obj = db.get(Application, app_id)
     if not obj:
         raise HTTPException(status_code=404, detail="Not found")
+    etag = _make_etag(obj.id, obj.updated_at)
+    if _etag_matches(request, etag):
+        return _not_modified(etag)
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = CACHE_CONTROL
     return ApplicationOut.model_validate(obj)
 
+def _commit_and_read_back(db: Session, obj: Application) -> ApplicationOut:
+    # Write responses must match what a following GET returns.
+    if engine.dialect.name != "sqlite":
+        db.commit()
+        db.refresh(obj)
+        return ApplicationOut.model_validate(obj)
+    # SQLite stores the timestamps as naive UTC text, so dropping tzinfo from
+    # the flushed in-memory values reproduces the GET body without a SELECT.
+    db.flush()
+    out = ApplicationOut.model_validate(obj)
+    out.created_at = out.created_at.replace(tzinfo=None)
+    out.updated_at = out.updated_at.replace(tzinfo=None)
+    db.commit()
+    return out
+
 @router.post("/applications", response_model=ApplicationOut, dependencies=[Depends(require_api_key)])
 def create_application(payload: ApplicationCreate, db: Session = Depends(get_db)):
     _validate_business_rules(payload)
@@ -102,7 +282,7 @@ def create_application(payload: ApplicationCreate, db: Session = Depends(get_db)
         role=payload.role,
         location=payload.location,
         source=payload.source,
-        link=str(payload.link) if payload.link else None,
+        link=payload.link,
         salary_min=payload.salary_min,
         salary_max=payload.salary_max,
         employment_type=payload.employment_type,
@@ -112,9 +292,8 @@ def create_application(payload: ApplicationCreate, db: Session = Depends(get_db)
         notes=payload.notes,
     )
     db.add(obj)
-    db.commit()
-    db.refresh(obj)
-    return ApplicationOut.model_validate(obj)
+    bump_collection_version(db)
+    return _commit_and_read_back(db, obj)
 
 @router.put("/applications/{app_id}", response_model=ApplicationOut, dependencies=[Depends(require_api_key)])
 def update_application(app_id: int, payload: ApplicationUpdate, db: Session = Depends(get_db)):
@@ -123,15 +302,12 @@ def update_application(app_id: int, payload: ApplicationUpdate, db: Session = De
     if not obj:
         raise HTTPException(status_code=404, detail="Not found")
 
-    for field, value in payload.model_dump(exclude_unset=True).items():
-        if field == "link" and value is not None:
-            setattr(obj, field, str(value))
-        else:
-            setattr(obj, field, value)
+    # Only fields the client sent; link is already a plain str (see schemas)
+    for field in payload.model_fields_set:
+        setattr(obj, field, getattr(payload, field))
     db.add(obj)
-    db.commit()
-    db.refresh(obj)
-    return ApplicationOut.model_validate(obj)
+    bump_collection_version(db)
+    return _commit_and_read_back(db, obj)
 
 @router.delete("/applications/{app_id}", status_code=204, dependencies=[Depends(require_api_key)])
 def delete_application(app_id: int, db: Session = Depends(get_db)):
@@ -139,6 +315,7 @@ def delete_application(app_id: int, db: Session = Depends(get_db)):
     if not obj:
         raise HTTPException(status_code=404, detail="Not found")
     db.delete(obj)
+    bump_collection_version(db)
     db.commit()
     return Response(status_code=204)
 
@@ -149,87 +326,39 @@ def export_csv(
     status: Optional[str] = None,
     order_by: str = "created_at",
     order_dir: str = "desc",
+    *,
+    request: Request,
     db: Session = Depends(get_db),
 ):
     """
-    Stream a CSV of the filtered set by internally paginating with page_size <= 100.
+    Stream a CSV of the filtered set from a single query, fetched in batches.
     """
-    # Validate enums/order inputs once
-    base_params = ListQueryParams(
+    _validate_list_enums(stage, status, order_by, order_dir)
+    etag = _collection_etag(db, request)
+    if _etag_matches(request, etag):
+        return _not_modified(etag)
+    params = ListQueryParams(
         search=search, stage=stage, status=status,
         order_by=order_by, order_dir=order_dir,
-        page=1, page_size=100  # respect the cap
     )
-    try:
-        base_params.validate_enums()
-    except ValueError as e:
-        raise HTTPException(status_code=400, detail=str(e))
 
     def row_iter() -> Iterable[Dict[str, object]]:
-        # header row first (iter_csv writes rows as-is)
-        yield {
-            "id": "id",
-            "company": "company",
-            "role": "role",
-            "location": "location",
-            "source": "source",
-            "link": "link",
-            "salary_min": "salary_min",
-            "salary_max": "salary_max",
-            "employment_type": "employment_type",
-            "stage": "stage",
-            "status": "status",
-            "next_action_date": "next_action_date",
-            "notes": "notes",
-            "created_at": "created_at",
-            "updated_at": "updated_at",
-        }
-
-        page = 1
-        while True:
-            params = ListQueryParams(
-                search=search,
-                stage=stage,
-                status=status,
-                order_by=order_by,
-                order_dir=order_dir,
-                page=page,
-                page_size=base_params.page_size,
-            )
-
-            stmt = select(Application)
-            stmt = _apply_filters(stmt, params)
-            stmt = _apply_ordering(stmt, params)
-            stmt = stmt.offset((params.page - 1) * params.page_size).limit(params.page_size)
-
-            rows = db.execute(stmt).scalars().all()
-            if not rows:
-                break
-
-            for r in rows:
-                yield {
-                    "id": r.id,
-                    "company": r.company,
-                    "role": r.role,
-                    "location": r.location,
-                    "source": r.source,
-                    "link": r.link,
-                    "salary_min": r.salary_min,
-                    "salary_max": r.salary_max,
-                    "employment_type": r.employment_type,
-                    "stage": r.stage,
-                    "status": r.status,
-                    "next_action_date": r.next_action_date.isoformat() if r.next_action_date else None,
-                    "notes": r.notes,
-                    "created_at": r.created_at.isoformat(),
-                    "updated_at": r.updated_at.isoformat(),
-                }
-
-            page += 1
+        stmt = select(Application)
+        stmt = _apply_filters(stmt, params)
+        stmt = _apply_ordering(stmt, params)
+        # One cursor for the whole export: server-side on Postgres, batched fetches on SQLite
+        result = db.scalars(stmt.execution_options(stream_results=True, yield_per=1000))
+
+        for r in result:
+            yield _row_to_csv(r)
 
     from starlette.responses import StreamingResponse
     return StreamingResponse(
-        iter_csv(row_iter()),
+        iter_csv(row_iter(), fieldnames=EXPORT_FIELDS),
         media_type="text/csv; charset=utf-8",
-        headers={"Content-Disposition": 'attachment; filename="export.csv"'}
+        headers={
+            "Content-Disposition": 'attachment; filename="export.csv"',
+            "ETag": etag,
+            "Cache-Control": CACHE_CONTROL,
+        },
     )
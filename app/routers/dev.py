@@ -1,26 +1,33 @@
 from fastapi import APIRouter, Depends
+from sqlalchemy import insert
 from sqlalchemy.orm import Session
 import os
 
 # ✅ import from app/database.py and app/models.py
 from ..database import get_db, Base, engine
 from .. import models
+from ..services.applications import bump_collection_version
 
 router = APIRouter()
 
+# rows per INSERT; keeps larger seeds under SQLite's bound-parameter limit
+SEED_CHUNK_SIZE = 500
+
 @router.post("/dev/seed", tags=["dev"])
 def seed_data(db: Session = Depends(get_db)):
     if os.getenv("ENV") != "dev":
         return {"error": "Seeding is disabled outside dev"}
 
-    # adjust fields to match your Application model
     rows = [
-        models.Application(name="Alice", email="alice@example.com"),
-        models.Application(name="Bob", email="bob@example.com"),
-        models.Application(name="Charlie", email="charlie@example.com"),
-        models.Application(name="Diana", email="diana@example.com"),
-        models.Application(name="Evan", email="evan@example.com"),
+        {"company": "Alice Co", "role": "Dev", "stage": "wishlist", "status": "active"},
+        {"company": "Bob Labs", "role": "Backend Developer", "stage": "applied", "status": "active"},
+        {"company": "Charlie Systems", "role": "Data Engineer", "stage": "phone", "status": "active"},
+        {"company": "Diana Analytics", "role": "Platform Engineer", "stage": "rejected", "status": "closed"},
+        {"company": "Evan Tech", "role": "SRE", "stage": "offer", "status": "active"},
     ]
-    db.add_all(rows)
+    # one executemany INSERT per chunk instead of a unit-of-work flush per object
+    for i in range(0, len(rows), SEED_CHUNK_SIZE):
+        db.execute(insert(models.Application), rows[i:i + SEED_CHUNK_SIZE])
+    bump_collection_version(db)
     db.commit()
     return {"inserted": len(rows)}
@@ -1,18 +1,29 @@
 from __future__ import annotations
-from typing import Optional, Literal
+from typing import Optional, Literal, Annotated
 from datetime import datetime, date
-from pydantic import BaseModel, Field, HttpUrl, ConfigDict
+from pydantic import BaseModel, Field, HttpUrl, ConfigDict, TypeAdapter, AfterValidator
 
 EMPLOYMENT_TYPES = {"full-time", "contract", "intern"}
 STAGES = {"wishlist", "applied", "oa", "phone", "onsite", "offer", "rejected", "ghosted"}
 STATUSES = {"active", "closed"}
+ORDER_BY_FIELDS = {"created_at", "updated_at", "next_action_date"}
+ORDER_DIRS = {"asc", "desc"}
+
+_HTTP_URL = TypeAdapter(HttpUrl)
+
+def _validate_http_url(value: str) -> str:
+    # Validate/normalize as HttpUrl but keep a plain str: the column stores a
+    # string and HttpUrl objects are comparatively expensive to carry around.
+    return str(_HTTP_URL.validate_python(value))
+
+HttpUrlStr = Annotated[str, AfterValidator(_validate_http_url)]
 
 class ApplicationBase(BaseModel):
     company: str = Field(..., max_length=200)
     role: str = Field(..., max_length=200)
     location: Optional[str] = Field(None, max_length=200)
     source: Optional[str] = Field(None, max_length=200)
-    link: Optional[HttpUrl] = Field(None)
+    link: Optional[HttpUrlStr] = Field(None)
     salary_min: Optional[int] = Field(None, ge=0)
     salary_max: Optional[int] = Field(None, ge=0)
     employment_type: Optional[str] = Field(None)  # validated manually to return 400 instead of 422
@@ -29,7 +40,7 @@ class ApplicationUpdate(BaseModel):
     role: Optional[str] = Field(None, max_length=200)
     location: Optional[str] = Field(None, max_length=200)
     source: Optional[str] = Field(None, max_length=200)
-    link: Optional[HttpUrl] = None
+    link: Optional[HttpUrlStr] = None
     salary_min: Optional[int] = Field(None, ge=0)
     salary_max: Optional[int] = Field(None, ge=0)
     employment_type: Optional[str] = None
@@ -45,7 +56,7 @@ class ApplicationOut(BaseModel):
     role: str
     location: Optional[str]
     source: Optional[str]
-    link: Optional[HttpUrl]
+    link: Optional[str]
     salary_min: Optional[int]
     salary_max: Optional[int]
     employment_type: Optional[str]
@@ -64,13 +75,5 @@ class ListQueryParams(BaseModel):
     page_size: int = Field(20, ge=1, le=100)
     order_by: str = Field("created_at")
     order_dir: str = Field("desc")
-
-    def validate_enums(self):
-        if self.stage is not None and self.stage not in STAGES:
-            raise ValueError("Invalid stage")
-        if self.status is not None and self.status not in STATUSES:
-            raise ValueError("Invalid status")
-        if self.order_by not in {"created_at", "updated_at", "next_action_date"}:
-            raise ValueError("Invalid order_by")
-        if self.order_dir not in {"asc", "desc"}:
-            raise ValueError("Invalid order_dir")
+    cursor: Optional[str] = None      # opaque keyset cursor from a previous page
+    with_total: bool = False          # COUNT(*) is only run on request
@@ -1,2 +1,22 @@
-# Placeholder for business logic if router grows.
-# For now, all logic lives in the router for simplicity.
+# Shared application-collection helpers used by more than one router.
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
+from ..models import Application, CollectionVersion
+
+_NAME = Application.__tablename__
+_VERSION_STMT = select(CollectionVersion.version).where(CollectionVersion.name == _NAME)
+_BUMP_STMT = (
+    update(CollectionVersion)
+    .where(CollectionVersion.name == _NAME)
+    .values(version=CollectionVersion.version + 1)
+    .execution_options(synchronize_session=False)
+)
+
+def collection_version(db: Session) -> int:
+    return db.scalar(_VERSION_STMT) or 0
+
+def bump_collection_version(db: Session) -> None:
+    # Call before commit so the bump lands in the write's transaction
+    if db.execute(_BUMP_STMT).rowcount == 0:
+        # row is seeded with the table; recreate it if it has gone missing
+        db.add(CollectionVersion(name=_NAME, version=1))
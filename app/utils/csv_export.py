@@ -1,24 +1,36 @@
 import csv
-from typing import Iterable, Dict
+import io
+from typing import Iterable, Iterator, Dict, Optional, Sequence
 
-def iter_csv(rows: Iterable[Dict[str, object]]):
-    # Header first
-    first = True
+# Rows written per yielded chunk; amortizes generator/StringIO overhead
+BATCH_ROWS = 256
+
+def iter_csv(
+    rows: Iterable[Dict[str, object]],
+    fieldnames: Optional[Sequence[str]] = None,
+    batch_rows: int = BATCH_ROWS,
+) -> Iterator[str]:
+    # Header comes from `fieldnames`, else the first row's keys. Values are
+    # written with str(), so callers pre-format anything that needs it (dates).
+    # Quoting is done by the C `_csv` writer rather than per value in Python.
+    buf = io.StringIO()
+    writer = None
+    if fieldnames is not None:
+        writer = csv.DictWriter(buf, fieldnames=fieldnames, lineterminator="\n")
+        writer.writeheader()
+
+    pending = 0
     for row in rows:
-        if first:
-            yield ','.join(csv_quote(k) for k in row.keys()) + '\n'
-            first = False
-        yield ','.join(csv_quote(v) for v in row.values()) + '\n'
-    if first:
-        # no rows -> emit header only is handled by caller (they pass header explicitly)
-        pass
+        if writer is None:
+            writer = csv.DictWriter(buf, fieldnames=list(row.keys()), lineterminator="\n")
+            writer.writeheader()
+        writer.writerow(row)
+        pending += 1
+        if pending >= batch_rows:
+            yield buf.getvalue()
+            buf.seek(0)
+            buf.truncate(0)
+            pending = 0
 
-def csv_quote(value):
-    if value is None:
-        s = ""
-    else:
-        s = str(value)
-    # Escape as needed
-    if any(ch in s for ch in [',', '\n', '"']):
-        s = '"' + s.replace('"', '""') + '"'
-    return s
+    if buf.tell():
+        yield buf.getvalue()
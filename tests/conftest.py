@@ -0,0 +1,8 @@
+import pytest
+from app.database import engine, Base
+
+@pytest.fixture(scope="session", autouse=True)
+def create_tables():
+    # The app only creates tables in its startup hook, which TestClient(app)
+    # without a `with` block never runs.
+    Base.metadata.create_all(bind=engine)
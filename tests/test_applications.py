@@ -1,8 +1,16 @@
+import base64
+import csv
+import io
 import os
 import time
 from fastapi.testclient import TestClient
 from app.main import app
-from app.database import engine, Base
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import Session
+from app.database import engine, Base, SessionLocal
+from app.services.applications import collection_version
+from app.models import Application
+from app.routers.applications import _search_clause
 
 os.environ.setdefault("API_KEY", "test-secret")
 client = TestClient(app)
@@ -35,11 +43,15 @@ def test_create_and_list():
     assert created["created_at"] and created["updated_at"]
 
     # list
-    r2 = client.get("/applications")
+    r2 = client.get("/applications?with_total=1")
     data = r2.json()
     assert "items" in data and "total" in data
     assert data["total"] >= 1
 
+    # total is skipped unless requested
+    r3 = client.get("/applications")
+    assert r3.json()["total"] is None
+
 def test_filters_and_pagination():
     # add second record
     payload2 = {
@@ -63,6 +75,82 @@ def test_filters_and_pagination():
     assert data["page"] == 2
     assert data["page_size"] == 1
 
+    # invalid enum/order values are 400s on every call, list and export alike
+    for _ in range(2):
+        assert client.get("/applications?stage=bogus").status_code == 400
+        assert client.get("/export.csv?order_dir=sideways").status_code == 400
+
+def _search_ids(term):
+    r = client.get("/applications", params={"search": term, "page_size": 100})
+    assert r.status_code == 200, r.text
+    return {item["id"] for item in r.json()["items"]}
+
+def test_search_substring_rename_and_delete():
+    r = client.post("/applications", json={"company": "Quuxwidgets", "role": "Platform Dev"}, headers=auth_headers())
+    app_id = r.json()["id"]
+
+    # case-insensitive substring match on company or role, including short terms
+    assert app_id in _search_ids("XWIDGET")
+    assert app_id in _search_ids("form dev")
+    assert app_id in _search_ids("qu")
+
+    # the index follows renames...
+    client.put(f"/applications/{app_id}", json={"company": "Frobnicate"}, headers=auth_headers())
+    assert app_id not in _search_ids("quuxwidgets")
+    assert app_id in _search_ids("robnic")
+    # ...and notes-only updates leave it intact
+    client.put(f"/applications/{app_id}", json={"notes": "followed up"}, headers=auth_headers())
+    assert app_id in _search_ids("robnic")
+
+    # ...and deletes
+    client.delete(f"/applications/{app_id}", headers=auth_headers())
+    assert app_id not in _search_ids("robnic")
+
+def test_search_index_reset_by_drop_all(tmp_path):
+    # separate DB so drop_all doesn't wipe the shared test tables
+    other = create_engine(f"sqlite:///{tmp_path / 'dropall.db'}")
+    Base.metadata.create_all(bind=other)
+    with Session(other) as s:
+        s.add(Application(company="Oldcorp", role="Dev"))
+        s.commit()
+    Base.metadata.drop_all(bind=other)
+    Base.metadata.create_all(bind=other)
+    with Session(other) as s:
+        s.add(Application(company="Newco", role="Dev"))
+        s.commit()
+        # the new row reuses rowid 1; a stale index would match it for "oldcorp"
+        assert s.scalars(select(Application.company).where(_search_clause("oldcorp"))).all() == []
+        assert s.scalars(select(Application.company).where(_search_clause("newco"))).all() == ["Newco"]
+    other.dispose()
+
+def test_cursor_pagination():
+    for i in range(3):
+        client.post("/applications", json={"company": f"Cursor {i}", "role": "Dev"}, headers=auth_headers())
+
+    seen = []
+    r = client.get("/applications?page_size=2")
+    first_cursor = r.json()["next_cursor"]
+    while True:
+        assert r.status_code == 200, r.text
+        data = r.json()
+        seen.extend(item["id"] for item in data["items"])
+        if not data["next_cursor"]:
+            break
+        r = client.get(f"/applications?page_size=2&cursor={data['next_cursor']}")
+
+    total = client.get("/applications?with_total=1").json()["total"]
+    assert len(seen) == len(set(seen)) == total
+    # total stays the full filtered count on cursor pages and past the last page
+    assert client.get(f"/applications?with_total=1&page_size=2&cursor={first_cursor}").json()["total"] == total
+    assert client.get("/applications?with_total=1&page=1000").json()["total"] == total
+    assert seen == sorted(seen, reverse=True)
+
+    bad = client.get("/applications?cursor=not-a-cursor")
+    assert bad.status_code == 400
+    # well-formed but forged: id beyond 64 bits
+    forged = base64.urlsafe_b64encode(b"2024-01-01T00:00:00|" + b"9" * 30).decode()
+    assert client.get(f"/applications?cursor={forged}").status_code == 400
+
 def test_get_update_delete():
     # create
     r = client.post("/applications", json={"company": "Gamma", "role": "Dev"}, headers=auth_headers())
@@ -72,6 +160,11 @@ def test_get_update_delete():
     g = client.get(f"/applications/{app_id}")
     assert g.status_code == 200
     assert g.json()["company"] == "Gamma"
+    assert g.json() == r.json()  # write responses match what a read returns
+
+    # conditional GET short-circuits until the row changes
+    etag = g.headers["etag"]
+    assert client.get(f"/applications/{app_id}", headers={"If-None-Match": etag}).status_code == 304
 
     # update and check updated_at changes
     before = g.json()["updated_at"]
@@ -79,12 +172,34 @@ def test_get_update_delete():
     assert u.status_code == 200
     after = u.json()["updated_at"]
     assert after != before
+    assert u.json() == client.get(f"/applications/{app_id}").json()
+    assert client.get(f"/applications/{app_id}", headers={"If-None-Match": etag}).status_code == 200
+
+    # collection ETag changes on delete as well
+    list_etag = client.get("/applications").headers["etag"]
+    assert client.get("/applications", headers={"If-None-Match": list_etag}).status_code == 304
 
     # delete
     d = client.delete(f"/applications/{app_id}", headers=auth_headers())
     assert d.status_code == 204
     not_found = client.get(f"/applications/{app_id}")
     assert not_found.status_code == 404
+    assert client.get("/applications", headers={"If-None-Match": list_etag}).status_code == 200
+
+def test_collection_etag_changes_on_delete():
+    older = client.post("/applications", json={"company": "Old Row", "role": "Dev"}, headers=auth_headers()).json()
+    client.post("/applications", json={"company": "New Row", "role": "Dev"}, headers=auth_headers())
+    etag = client.get("/applications").headers["etag"]
+    with Session(engine) as s:
+        before = collection_version(s)
+
+    # deleting a row that is neither newest nor the only one still bumps the version
+    client.delete(f"/applications/{older['id']}", headers=auth_headers())
+    with Session(engine) as s:
+        assert collection_version(s) == before + 1
+    r = client.get("/applications", headers={"If-None-Match": etag})
+    assert r.status_code == 200
+    assert r.headers["etag"] != etag
 
 def test_auth_required():
     r = client.post("/applications", json={"company": "NoAuth", "role": "Dev"})
@@ -109,9 +224,21 @@ def test_salary_bounds_and_enums():
     assert r2.status_code == 400
 
 def test_export_csv():
+    client.post("/applications", json={"company": "Export Co", "role": "Dev", "status": "active"}, headers=auth_headers())
     r = client.get("/export.csv?status=active")
     assert r.status_code == 200
     assert r.headers["content-type"].startswith("text/csv")
     text = r.text.splitlines()
     assert len(text) >= 2  # header + at least one row
     assert "company" in text[0]
+    assert text.count(text[0]) == 1  # header written once
+    rows = list(csv.DictReader(io.StringIO(r.text)))
+    assert all("T" in row["created_at"] for row in rows)  # ISO 8601 timestamps
+
+def test_sessions_removed_after_request():
+    client.post("/applications", json={"company": "Scope Co", "role": "Dev"}, headers=auth_headers())
+    client.get("/applications")
+    assert SessionLocal.registry.registry == {}
+    r = client.get("/export.csv")
+    assert len(r.text.splitlines()) >= 2
+    assert SessionLocal.registry.registry == {}
@@ -0,0 +1,26 @@
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from app.routers import applications, dev
+
+# app.main only mounts dev.router when ENV=dev at import, so build a small app
+dev_app = FastAPI()
+dev_app.include_router(dev.router)
+dev_app.include_router(applications.router)
+client = TestClient(dev_app)
+
+SEEDED = ["Alice Co", "Bob Labs", "Charlie Systems", "Diana Analytics", "Evan Tech"]
+
+def test_seed_disabled_outside_dev(monkeypatch):
+    monkeypatch.delenv("ENV", raising=False)
+    r = client.post("/dev/seed")
+    assert r.json() == {"error": "Seeding is disabled outside dev"}
+
+def test_seed_inserts_valid_rows(monkeypatch):
+    monkeypatch.setenv("ENV", "dev")
+    r = client.post("/dev/seed")
+    assert r.status_code == 200, r.text
+    assert r.json() == {"inserted": 5}
+
+    for company in SEEDED:
+        found = client.get("/applications", params={"search": company, "page_size": 100}).json()["items"]
+        assert any(item["company"] == company and item["role"] for item in found)